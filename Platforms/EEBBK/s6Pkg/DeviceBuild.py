@@ -3,14 +3,10 @@
 # SPDX-License-Identifier: BSD-2-Clause-Patent
 ##
 
-import datetime
 import logging
 import os
 import sys  # 确保已导入sys
 
-from io import StringIO
-from pathlib import Path
-
 from edk2toolext.environment import shell_environment
 from edk2toolext.environment.uefi_build import UefiBuilder
 from edk2toolext.invocables.edk2_platform_build import BuildSettingsManager
@@ -18,15 +14,70 @@ from edk2toolext.invocables.edk2_pr_eval import PrEvalSettingsManager
 from edk2toolext.invocables.edk2_setup import (RequiredSubmodule, SetupSettingsManager)
 from edk2toolext.invocables.edk2_update import UpdateSettingsManager
 from edk2toolext.invocables.edk2_parse import ParseSettingsManager
-from edk2toollib.utility_functions import RunCmd
+
+# ####################################################################################### #
+#                                   Stat Result Cache                                     #
+# ####################################################################################### #
+# 每次 setup/update/build 都是独立进程, 缓存随进程结束失效
+_stat_cache: dict = {}
+
+def _cached_isfile (p):
+    key = ("isfile", p)
+    if key not in _stat_cache:
+        _stat_cache[key] = os.path.isfile(p)
+    return _stat_cache[key]
+
+def _cached_exists (p):
+    key = ("exists", p)
+    if key not in _stat_cache:
+        _stat_cache[key] = os.path.exists(p)
+    return _stat_cache[key]
+
+def _cached_listdir_names (p):
+    key = ("scandir", p)
+    if key not in _stat_cache:
+        try:
+            with os.scandir(p) as it:
+                _stat_cache[key] = frozenset(entry.name for entry in it)
+        except OSError:
+            _stat_cache[key] = frozenset()
+    return _stat_cache[key]
+
+# 设置 S6_VERBOSE=1/true/yes 以启用详细日志
+_VERBOSE = os.environ.get("S6_VERBOSE", "").lower() in ("1", "true", "yes")
+
+# PR 评估时触发全量构建的文件规则
+_TRIGGER_EXTS = frozenset({".txt", ".md"})
+_YAML_TRIGGER = "platform-build-run-steps.yml"
+
+# 仅在 DSC 缺失时输出诊断信息
+def _report_missing_dsc (workspace, dsc_path, level):
+    logging.log(level, "DSC file not found: %s", dsc_path)
+    logging.log(level, "Current directory: %s", os.getcwd())
+    if logging.getLogger().isEnabledFor(level):
+        if _cached_exists(workspace):
+            logging.log(level, "Workspace contents: %s", os.listdir(workspace))
+        dsc_dir = os.path.dirname(dsc_path)
+        if _cached_exists(dsc_dir):
+            logging.log(level, "Directory contents: %s", os.listdir(dsc_dir))
+
+# 预先计算子模块的 (绝对路径, 父目录, 目录名)
+def _split_submodule_paths (workspace, submodules):
+    result = {}
+    for name, _ in submodules:
+        sub_path = os.path.join(workspace, name)
+        result[name] = (sub_path, *os.path.split(sub_path))
+    return result
 
 # ####################################################################################### #
 #                                Common Configuration                                     #
 # ####################################################################################### #
 class CommonPlatform ():
-    PackagesSupported = ("s6Pkg")
-    ArchSupported = ("AARCH64")
+    PackagesSupported = ("s6Pkg",)
+    ArchSupported = ("AARCH64",)
     TargetsSupported = ("DEBUG", "RELEASE")
+    ArchSet = frozenset(ArchSupported)
+    TargetSet = frozenset(TargetsSupported)
     Scopes = ('s6', 'gcc_aarch64_linux', 'edk2-build')
     
     # 修复工作空间路径计算
@@ -34,7 +85,21 @@ class CommonPlatform ():
     
     # 添加 DSC 文件路径变量
     DscPath = "s6Pkg/s6.dsc"
-    
+    DscAbsPath = os.path.join(WorkspaceRoot, DscPath)
+
+    # 子模块列表: (路径, 是否递归), 路径在加载时一次性拆分
+    Submodules = (
+        ("Binaries", False),
+        ("Common/Mu", True),
+        ("Common/Mu_OEM_Sample", True),
+        ("Common/Mu_Tiano_Plus", True),
+        ("Features/DFCI", True),
+        ("Mu_Basecore", True),
+        ("Silicon/Arm/Mu_Tiano", True),
+        ("Silicium-ACPI", True)
+    )
+    SubmodulePaths = _split_submodule_paths(WorkspaceRoot, Submodules)
+
     PackagesPath = (
         "Platforms/Lenovo",
         "Common/Mu",
@@ -65,29 +130,23 @@ class SettingsManager (UpdateSettingsManager, SetupSettingsManager, PrEvalSettin
     def GetRequiredSubmodules (self):
         required = [
             # 修复参数传递方式 - 使用关键字参数
-            RequiredSubmodule("Binaries", optional=True, recursive=False),
-            RequiredSubmodule("Common/Mu", optional=True),
-            RequiredSubmodule("Common/Mu_OEM_Sample", optional=True),
-            RequiredSubmodule("Common/Mu_Tiano_Plus", optional=True),
-            RequiredSubmodule("Features/DFCI", optional=True),
-            RequiredSubmodule("Mu_Basecore", optional=True),
-            RequiredSubmodule("Silicon/Arm/Mu_Tiano", optional=True),
-            RequiredSubmodule("Silicium-ACPI", optional=True),
+            RequiredSubmodule(name, optional=True, recursive=recursive)
+            for name, recursive in CommonPlatform.Submodules
         ]
         
         # 添加子模块路径验证
-        workspace = self.GetWorkspaceRoot()
+        # 父目录的扫描结果会被缓存, 同一父目录下的子模块只扫描一次
         for submodule in required:
-            sub_path = os.path.join(workspace, submodule.path)
-            if not os.path.exists(sub_path):
-                logging.error(f"Submodule path missing: {sub_path}")
-            elif not os.path.exists(os.path.join(sub_path, ".git")):
-                logging.error(f"Submodule not initialized: {sub_path}")
+            sub_path, parent, name = CommonPlatform.SubmodulePaths[submodule.path]
+            if name not in _cached_listdir_names(parent):
+                logging.error("Submodule path missing: %s", sub_path)
+            elif not _cached_exists(os.path.join(sub_path, ".git")):
+                logging.error("Submodule not initialized: %s", sub_path)
                 
         return required
 
     def SetArchitectures (self, list_of_requested_architectures):
-        unsupported = set(list_of_requested_architectures) - set(self.GetArchitecturesSupported())
+        unsupported = [a for a in list_of_requested_architectures if a not in CommonPlatform.ArchSet]
 
         if (len(unsupported) > 0):
             errorString = ("Unsupported Architecture Requested: " + " ".join(unsupported))
@@ -103,29 +162,20 @@ class SettingsManager (UpdateSettingsManager, SetupSettingsManager, PrEvalSettin
         return CommonPlatform.Scopes
 
     def FilterPackagesToTest (self, changedFilesList: list, potentialPackagesList: list) -> list:
-        build_these_packages = []
-        possible_packages = potentialPackagesList.copy ()
-
         for f in changedFilesList:
-            if "BaseTools" in f:
-                if os.path.splitext(f) not in [".txt", ".md"]:
-                    build_these_packages = possible_packages
-                    break
+            if "BaseTools" in f and os.path.splitext(f)[1] not in _TRIGGER_EXTS:
+                return list(potentialPackagesList)
 
-            if "platform-build-run-steps.yml" in f:
-                build_these_packages = possible_packages
-                break
+            if _YAML_TRIGGER in f:
+                return list(potentialPackagesList)
 
-        return build_these_packages
+        return []
 
     def GetPlatformDscAndConfig (self) -> tuple:
         # 使用绝对路径确保可靠解析
-        dsc_path = os.path.join(CommonPlatform.WorkspaceRoot, CommonPlatform.DscPath)
-        if not os.path.isfile(dsc_path):
-            logging.error(f"DSC file not found at: {dsc_path}")
-            logging.error(f"Current directory: {os.getcwd()}")
-            if os.path.exists(os.path.dirname(dsc_path)):
-                logging.error(f"Directory contents: {os.listdir(os.path.dirname(dsc_path))}")
+        dsc_path = CommonPlatform.DscAbsPath
+        if not _cached_isfile(dsc_path):
+            _report_missing_dsc(self.GetWorkspaceRoot(), dsc_path, logging.ERROR)
             raise FileNotFoundError(f"DSC file missing: {dsc_path}")
         return (CommonPlatform.DscPath, {})
 
@@ -141,24 +191,26 @@ class SettingsManager (UpdateSettingsManager, SetupSettingsManager, PrEvalSettin
 class PlatformBuilder (UefiBuilder, BuildSettingsManager):
     def __init__ (self):
         UefiBuilder.__init__ (self)
+        self._packages_path_cache = None
 
     def AddCommandLineOptions (self, parserObj):
         parserObj.add_argument('-a', "--arch", dest="build_arch", type=str, default="AARCH64", help="Optional - CSV of architecture to build. AARCH64 is used for PEI and DXE and is the only valid option for this platform.")
 
     def RetrieveCommandLineOptions (self, args):
-        if args.build_arch.upper() != "AARCH64":
+        if args.build_arch.upper() not in CommonPlatform.ArchSet:
             raise Exception("Invalid Arch Specified.  Please see comments in DeviceBuild.py::PlatformBuilder::AddCommandLineOptions")
 
     def GetWorkspaceRoot (self):
         return CommonPlatform.WorkspaceRoot
 
     def GetPackagesPath (self):
-        result = [ shell_environment.GetBuildVars().GetValue("FEATURE_CONFIG_PATH", "") ]
+        feature_cfg = shell_environment.GetBuildVars().GetValue("FEATURE_CONFIG_PATH", "")
 
-        for a in CommonPlatform.PackagesPath:
-            result.append(a)
+        # FEATURE_CONFIG_PATH 未变化时复用上次结果
+        if self._packages_path_cache is None or self._packages_path_cache[0] != feature_cfg:
+            self._packages_path_cache = (feature_cfg, (feature_cfg, *CommonPlatform.PackagesPath))
 
-        return result
+        return self._packages_path_cache[1]
 
     def GetActiveScopes (self):
         return CommonPlatform.Scopes
@@ -167,23 +219,22 @@ class PlatformBuilder (UefiBuilder, BuildSettingsManager):
         return "s6Pkg"
 
     def GetLoggingLevel (self, loggerType):
+        if loggerType == "txt" and not _VERBOSE:
+            return logging.WARNING
         return logging.INFO
 
     def SetPlatformEnv (self):
         logging.debug ("PlatformBuilder SetPlatformEnv")
 
         # 添加路径验证
-        workspace = self.GetWorkspaceRoot()
-        dsc_path = os.path.join(workspace, CommonPlatform.DscPath)
-        if not os.path.isfile(dsc_path):
-            logging.critical(f"DSC file not found: {dsc_path}")
-            logging.critical(f"Current directory: {os.getcwd()}")
-            if os.path.exists(workspace):
-                logging.critical(f"Workspace contents: {os.listdir(workspace)}")
-            if os.path.exists(os.path.join(workspace, "s6Pkg")):
-                logging.critical(f"s6Pkg contents: {os.listdir(os.path.join(workspace, 's6Pkg'))}")
+        if not _cached_isfile(CommonPlatform.DscAbsPath):
+            _report_missing_dsc(self.GetWorkspaceRoot(), CommonPlatform.DscAbsPath, logging.CRITICAL)
             raise FileNotFoundError("Critical DSC file missing")
-        
+
+        fd_base = self.env.GetValue("FD_BASE")
+        fd_size = self.env.GetValue("FD_SIZE")
+        fd_blocks = self.env.GetValue("FD_BLOCKS")
+
         self.env.SetValue ("PRODUCT_NAME", "s6", "Platform Hardcoded")
         self.env.SetValue ("ACTIVE_PLATFORM", CommonPlatform.DscPath, "Platform Hardcoded")
         self.env.SetValue ("TARGET_ARCH", "AARCH64", "Platform Hardcoded")
@@ -196,9 +247,9 @@ class PlatformBuilder (UefiBuilder, BuildSettingsManager):
         self.env.SetValue ("BUILDREPORT_TYPES", "PCD DEPEX FLASH BUILD_FLAGS LIBRARY FIXED_ADDRESS HASH", "Setting build report types")
         self.env.SetValue ("BLD_*_MEMORY_PROTECTION", "TRUE", "Default")
         self.env.SetValue ("BLD_*_SHIP_MODE", "FALSE", "Default")
-        self.env.SetValue ("BLD_*_FD_BASE", self.env.GetValue("FD_BASE"), "Default")
-        self.env.SetValue ("BLD_*_FD_SIZE", self.env.GetValue("FD_SIZE"), "Default")
-        self.env.SetValue ("BLD_*_FD_BLOCKS", self.env.GetValue("FD_BLOCKS"), "Default")
+        self.env.SetValue ("BLD_*_FD_BASE", fd_base, "Default")
+        self.env.SetValue ("BLD_*_FD_SIZE", fd_size, "Default")
+        self.env.SetValue ("BLD_*_FD_BLOCKS", fd_blocks, "Default")
 
         return 0
 
@@ -214,16 +265,19 @@ class PlatformBuilder (UefiBuilder, BuildSettingsManager):
 if __name__ == "__main__":
     import argparse
 
-    from edk2toolext.invocables.edk2_platform_build import Edk2PlatformBuild
-    from edk2toolext.invocables.edk2_setup import Edk2PlatformSetup
-    from edk2toolext.invocables.edk2_update import Edk2Update
-
-    # 配置详细日志
-    logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[logging.StreamHandler(sys.stdout)]
-    )
+    # 仅在 S6_VERBOSE 下配置详细日志
+    if _VERBOSE:
+        logging.basicConfig(
+            level=logging.DEBUG,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[logging.StreamHandler(sys.stdout)]
+        )
+    else:
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(levelname)s %(message)s',
+            handlers=[logging.StreamHandler(sys.stdout)]
+        )
 
     SCRIPT_PATH = os.path.relpath (__file__)
 
@@ -242,18 +296,21 @@ if __name__ == "__main__":
     sys.argv = new_args
 
     if args.setup:
+        from edk2toolext.invocables.edk2_setup import Edk2PlatformSetup
         try:
             Edk2PlatformSetup().Invoke()
         except Exception as e:
             logging.exception("Setup failed with exception")
             sys.exit(1)
     elif args.update:
+        from edk2toolext.invocables.edk2_update import Edk2Update
         try:
             Edk2Update().Invoke()
         except Exception as e:
             logging.exception("Update failed with exception")
             sys.exit(1)
     else:
+        from edk2toolext.invocables.edk2_platform_build import Edk2PlatformBuild
         try:
             Edk2PlatformBuild().Invoke()
         except Exception as e: